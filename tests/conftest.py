@@ -0,0 +1,42 @@
+import pytest
+from bson import ObjectId
+
+from voice_db.import_studies import _dataset_names, _index_study
+
+
+def _make_study(doi="10.1/abc", title="A study", source=(), target=(), **fields):
+    """Build a study that passes the schema; doi=None leaves the DOI out."""
+    study = {
+        "study_id": "s1",
+        "title": title,
+        "authors": [],
+        "publication_type": "journal",
+        "journal": "J",
+        "year": 2020,
+        "ml_approaches": [{"algorithm": "SVM", "results": {}}],
+        "source_dataset": [{"name": name} for name in source],
+        "target_dataset": [{"name": name} for name in target],
+        **fields,
+    }
+    if doi is not None:
+        study["doi"] = doi
+    return study
+
+
+def _index_studies(*studies):
+    """Build the DOI and title lookup tables of stored studies, giving each an _id if it has none."""
+    existing_by_doi, existing_by_title = {}, {}
+    for study in studies:
+        study.setdefault("_id", ObjectId())
+        _index_study(existing_by_doi, existing_by_title, study, _dataset_names(study))
+    return existing_by_doi, existing_by_title
+
+
+@pytest.fixture
+def make_study():
+    return _make_study
+
+
+@pytest.fixture
+def index_studies():
+    return _index_studies
@@ -0,0 +1,105 @@
+from bson import ObjectId
+
+from voice_db.import_studies import _dataset_names, _find_duplicate, _index_study, _unindex_study
+
+
+def test_dataset_names_reads_source_and_target_datasets(make_study):
+    study = make_study(source=["PC-GITA", "Sakar"], target=["Italian PVS"])
+    study["source_dataset"].append({"size": 10})
+    study["dataset"] = [{"name": "ignored"}]
+
+    assert _dataset_names(study) == {"PC-GITA", "Sakar", "Italian PVS"}
+    assert _dataset_names({}) == frozenset()
+
+
+def test_doi_hit(make_study, index_studies):
+    stored = make_study(doi="10.1/abc", title="Stored title")
+    existing_by_doi, existing_by_title = index_studies(stored)
+
+    new = make_study(doi="10.1/abc", title="Different title")
+    assert _find_duplicate(new, existing_by_doi, existing_by_title) == stored["_id"]
+
+
+def test_doi_takes_precedence_over_title(make_study, index_studies):
+    stored = make_study(doi="10.1/abc", title="Same title")
+    existing_by_doi, existing_by_title = index_studies(stored)
+
+    new = make_study(doi="10.1/other", title="Same title")
+    assert _find_duplicate(new, existing_by_doi, existing_by_title) is None
+
+
+def test_title_fallback_without_doi(make_study, index_studies):
+    stored = make_study(doi="10.1/abc", title="Same title")
+    existing_by_doi, existing_by_title = index_studies(stored)
+
+    new = make_study(doi=None, title="Same title")
+    assert _find_duplicate(new, existing_by_doi, existing_by_title) == stored["_id"]
+    assert _find_duplicate(make_study(doi="", title="Same title"), existing_by_doi, existing_by_title) == stored["_id"]
+    assert _find_duplicate(make_study(doi=None, title="Other title"), existing_by_doi, existing_by_title) is None
+
+
+def test_no_doi_and_no_title_is_never_a_duplicate(make_study, index_studies):
+    existing_by_doi, existing_by_title = index_studies(make_study(doi="10.1/abc"))
+
+    assert _find_duplicate({"_id": ObjectId()}, existing_by_doi, existing_by_title) is None
+
+
+def test_dataset_intersection(make_study, index_studies):
+    stored = make_study(doi="10.1/abc", source=["PC-GITA"], target=["Sakar"])
+    existing_by_doi, existing_by_title = index_studies(stored)
+
+    same_dataset = make_study(doi="10.1/abc", source=["Sakar"])
+    other_dataset = make_study(doi="10.1/abc", source=["Italian PVS"])
+
+    names = _dataset_names(same_dataset)
+    assert _find_duplicate(same_dataset, existing_by_doi, existing_by_title, names) == stored["_id"]
+    names = _dataset_names(other_dataset)
+    assert _find_duplicate(other_dataset, existing_by_doi, existing_by_title, names) is None
+
+
+def test_empty_datasets_match_any_stored_study_with_datasets(make_study, index_studies):
+    with_datasets = make_study(doi="10.1/abc", source=["PC-GITA"])
+    without_datasets = make_study(doi="10.1/xyz")
+    existing_by_doi, existing_by_title = index_studies(with_datasets, without_datasets)
+
+    new = make_study(doi="10.1/abc")
+    assert _find_duplicate(new, existing_by_doi, existing_by_title, frozenset()) == with_datasets["_id"]
+
+    # A stored study without datasets is not matched by a new study without datasets
+    new = make_study(doi="10.1/xyz")
+    assert _find_duplicate(new, existing_by_doi, existing_by_title, frozenset()) is None
+    # ... but basic detection (no dataset check) still matches it
+    assert _find_duplicate(new, existing_by_doi, existing_by_title) == without_datasets["_id"]
+
+
+def test_in_run_duplicates(make_study, index_studies):
+    existing_by_doi, existing_by_title = index_studies()
+    first = make_study(doi="10.1/abc", source=["PC-GITA"], _id=ObjectId())
+    names = _dataset_names(first)
+
+    assert _find_duplicate(first, existing_by_doi, existing_by_title, names) is None
+    _index_study(existing_by_doi, existing_by_title, first, names)
+
+    second = make_study(doi="10.1/abc", source=["PC-GITA"])
+    assert _find_duplicate(second, existing_by_doi, existing_by_title, _dataset_names(second)) == first["_id"]
+
+    # Same paper on a different dataset is a separate study in enhanced mode
+    third = make_study(doi="10.1/abc", source=["Sakar"])
+    assert _find_duplicate(third, existing_by_doi, existing_by_title, _dataset_names(third)) is None
+
+
+def test_unindex_failed_study(make_study, index_studies):
+    stored = make_study(doi="10.1/abc", title="Same title", source=["PC-GITA"])
+    failed = make_study(doi="10.1/abc", title="Same title", source=["Sakar"])
+    existing_by_doi, existing_by_title = index_studies(stored, failed)
+
+    _unindex_study(existing_by_doi, existing_by_title, failed)
+
+    new = make_study(doi="10.1/abc", source=["Sakar"])
+    assert _find_duplicate(new, existing_by_doi, existing_by_title, _dataset_names(new)) is None
+    assert _find_duplicate(new, existing_by_doi, existing_by_title) == stored["_id"]
+    assert existing_by_title == {"Same title": [(stored["_id"], frozenset({"PC-GITA"}))]}
+
+    # The last entry of a key removes the key
+    _unindex_study(existing_by_doi, existing_by_title, stored)
+    assert existing_by_doi == existing_by_title == {}
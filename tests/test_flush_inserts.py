@@ -0,0 +1,102 @@
+import logging
+
+from pymongo import ReplaceOne
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from voice_db.import_studies import DUPLICATE_KEY_ERROR, _flush_inserts
+
+
+class StubCollection:
+    """Records the documents written, and raises error (if any) after recording them."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.written = []
+
+    def insert_many(self, documents, ordered=True):
+        self.written.append(list(documents))
+        if self.error is not None:
+            raise self.error
+
+    def bulk_write(self, requests, ordered=True):
+        self.insert_many(requests, ordered)
+
+
+def write_errors(*errors):
+    return BulkWriteError({"writeErrors": [
+        {"index": index, "code": code, "errmsg": f"error {code}"} for index, code in errors
+    ]})
+
+
+def upserts(hash_docs):
+    return [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in hash_docs]
+
+
+def batch(size):
+    pending = [{"_id": index} for index in range(size)]
+    pending_files = [f"study_{index}.json" for index in range(size)]
+    pending_hashes = [{"_id": f"hash_{index}", "study_id": index} for index in range(size)]
+    return pending, pending_files, pending_hashes
+
+
+def test_empty_batch():
+    collection, hash_collection = StubCollection(), StubCollection()
+
+    assert _flush_inserts(collection, hash_collection, [], [], []) == (0, [], [])
+    assert collection.written == hash_collection.written == []
+
+
+def test_all_inserted():
+    collection, hash_collection = StubCollection(), StubCollection()
+    pending, pending_files, pending_hashes = batch(3)
+
+    assert _flush_inserts(collection, hash_collection, pending, pending_files, pending_hashes) == (3, [], [])
+    assert collection.written == [pending]
+    assert hash_collection.written == [upserts(pending_hashes)]
+
+
+def test_partial_bulk_write_error():
+    collection = StubCollection(write_errors((1, DUPLICATE_KEY_ERROR), (3, 121)))
+    hash_collection = StubCollection()
+    pending, pending_files, pending_hashes = batch(4)
+
+    inserted, errors, failed = _flush_inserts(collection, hash_collection, pending, pending_files, pending_hashes)
+
+    assert inserted == 2
+    assert errors == [
+        {"file": "study_1.json", "error_type": "BulkWriteError", "error_message": "error 11000"},
+        {"file": "study_3.json", "error_type": "BulkWriteError", "error_message": "error 121"},
+    ]
+    assert failed == [pending_hashes[1], pending_hashes[3]]
+    # Only the hashes of the inserted files are recorded
+    assert hash_collection.written == [upserts([pending_hashes[0], pending_hashes[2]])]
+
+
+def test_whole_batch_failure():
+    collection, hash_collection = StubCollection(AutoReconnect("connection lost")), StubCollection()
+    pending, pending_files, pending_hashes = batch(2)
+
+    inserted, errors, failed = _flush_inserts(collection, hash_collection, pending, pending_files, pending_hashes)
+
+    assert inserted == 0
+    assert errors == [
+        {"file": "study_0.json", "error_type": "AutoReconnect", "error_message": "connection lost"},
+        {"file": "study_1.json", "error_type": "AutoReconnect", "error_message": "connection lost"},
+    ]
+    assert failed == pending_hashes
+    assert hash_collection.written == []
+
+
+def test_hash_errors_other_than_duplicate_keys_are_logged(caplog):
+    collection = StubCollection(write_errors((0, DUPLICATE_KEY_ERROR)))
+    hash_collection = StubCollection(write_errors((0, DUPLICATE_KEY_ERROR), (1, 2)))
+    pending, pending_files, pending_hashes = batch(3)
+
+    with caplog.at_level(logging.ERROR, logger="voice_db.import_studies"):
+        result = _flush_inserts(collection, hash_collection, pending, pending_files, pending_hashes)
+
+    assert result[0] == 2
+    # The hash errors index the hashes of the inserted files, not the whole batch
+    assert hash_collection.written == [upserts([pending_hashes[1], pending_hashes[2]])]
+    hash_messages = [record.getMessage() for record in caplog.records if "content hash" in record.getMessage()]
+    assert hash_messages == ["❌ Could not record the content hash of study_2.json: error 2"]
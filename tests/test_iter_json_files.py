@@ -0,0 +1,33 @@
+import logging
+import os
+
+from voice_db import import_studies
+from voice_db.import_studies import _iter_json_files
+
+
+def test_yields_json_files_recursively(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    for name in ("top.json", "a/nested.json", "a/b/deep.json", "a/notes.txt"):
+        (tmp_path / name).write_bytes(b"{}")
+
+    assert sorted(_iter_json_files(str(tmp_path))) == sorted(
+        str(tmp_path / name) for name in ("top.json", "a/nested.json", "a/b/deep.json")
+    )
+
+
+def test_unreadable_folders_are_skipped(tmp_path, monkeypatch, caplog):
+    (tmp_path / "locked").mkdir()
+    (tmp_path / "locked" / "hidden.json").write_bytes(b"{}")
+    (tmp_path / "study.json").write_bytes(b"{}")
+
+    scandir = os.scandir
+
+    def fake_scandir(path):
+        if path == str(tmp_path / "locked"):
+            raise PermissionError(13, "Permission denied", path)
+        return scandir(path)
+
+    monkeypatch.setattr(import_studies.os, "scandir", fake_scandir)
+    with caplog.at_level(logging.WARNING, logger="voice_db.import_studies"):
+        assert list(_iter_json_files(str(tmp_path))) == [str(tmp_path / "study.json")]
+    assert "Skipping unreadable folder" in caplog.text
@@ -0,0 +1,126 @@
+import bson
+import orjson
+import pytest
+import xxhash
+from bson import ObjectId
+
+from voice_db.import_studies import MMAP_MIN_SIZE, _init_worker, _open_bytes, _parse_validate
+
+
+def write_study(tmp_path, study, name="study.json"):
+    path = tmp_path / name
+    path.write_bytes(orjson.dumps(study))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def reset_worker():
+    _init_worker(frozenset(), None)
+    yield
+    _init_worker(frozenset(), None)
+
+
+def test_ok(tmp_path, make_study):
+    study = make_study(source=["PC-GITA"])
+    path = write_study(tmp_path, study)
+
+    file_path, status, payload, content_hash = _parse_validate(path)
+
+    assert (file_path, status) == (path, "ok")
+    assert content_hash == xxhash.xxh3_64_hexdigest(orjson.dumps(study))
+    keys, dataset_names, document = payload
+    assert isinstance(keys["_id"], ObjectId)
+    assert (keys["doi"], keys["title"]) == ("10.1/abc", "A study")
+    assert dataset_names == {"PC-GITA"}
+    assert bson.decode(document) == {**study, "_id": keys["_id"]}
+
+
+def test_known(tmp_path, make_study):
+    path = write_study(tmp_path, make_study())
+    content_hash = _parse_validate(path)[3]
+    _init_worker(frozenset({content_hash}), None)
+
+    assert _parse_validate(path) == (path, "known", None, content_hash)
+
+
+def test_stored_returns_the_matched_study(tmp_path, make_study, index_studies):
+    stored = make_study(source=["PC-GITA"])
+    _init_worker(frozenset(), (*index_studies(stored), True))
+
+    new = make_study(title="Other title", source=["PC-GITA"])
+    file_path, status, payload, _ = _parse_validate(write_study(tmp_path, new))
+
+    assert status == "stored"
+    assert payload == ({"doi": "10.1/abc", "title": "Other title"}, stored["_id"])
+
+
+def test_stored_skips_validation(tmp_path, make_study, index_studies):
+    _init_worker(frozenset(), (*index_studies(make_study(source=["PC-GITA"])), True))
+
+    # Missing required fields, but it is already stored so it is not validated
+    new = {"doi": "10.1/abc", "source_dataset": [{"name": "PC-GITA"}]}
+    status = _parse_validate(write_study(tmp_path, new))[1]
+    assert status == "stored"
+
+
+def test_stored_respects_dataset_matching(tmp_path, make_study, index_studies):
+    stored_studies = index_studies(make_study(source=["PC-GITA"]))
+    path = write_study(tmp_path, make_study(source=["Sakar"]))
+
+    _init_worker(frozenset(), (*stored_studies, True))
+    assert _parse_validate(path)[1] == "ok"
+
+    _init_worker(frozenset(), (*stored_studies, False))
+    assert _parse_validate(path)[1] == "stored"
+
+
+def test_invalid(tmp_path, make_study):
+    study = make_study()
+    del study["journal"]
+    path = write_study(tmp_path, study)
+
+    file_path, status, payload, _ = _parse_validate(path)
+
+    assert status == "invalid"
+    assert payload["file"] == path
+    assert "journal" in payload["error"]
+
+
+def test_integers_beyond_64_bits_are_reported(tmp_path, make_study):
+    path = tmp_path / "study.json"
+    path.write_bytes(orjson.dumps(make_study())[:-1] + b',"sample_size":123456789012345678901234567890}')
+
+    file_path, status, payload, _ = _parse_validate(str(path))
+
+    assert status == "error"
+    assert payload["error_type"] == "OverflowError"
+
+
+def test_long_digit_runs_in_strings_parse_normally(tmp_path, make_study):
+    study = make_study(title="Study 1234567890123456789012345")
+    file_path, status, payload, _ = _parse_validate(write_study(tmp_path, study))
+
+    assert status == "ok"
+    assert bson.decode(payload[2])["title"] == study["title"]
+
+
+def test_large_files_are_memory_mapped(tmp_path, make_study):
+    # The long digit run also sends the memory-mapped content through the json fallback
+    study = make_study(title="Study 1234567890123456789012345", abstract="x" * MMAP_MIN_SIZE)
+    path = write_study(tmp_path, study)
+
+    with _open_bytes(path) as raw:
+        assert isinstance(raw, memoryview)
+        assert raw == orjson.dumps(study)
+
+    file_path, status, payload, content_hash = _parse_validate(path)
+    assert status == "ok"
+    assert content_hash == xxhash.xxh3_64_hexdigest(orjson.dumps(study))
+    assert bson.decode(payload[2])["abstract"] == study["abstract"]
+
+
+def test_small_files_are_read(tmp_path, make_study):
+    study = make_study()
+    with _open_bytes(write_study(tmp_path, study)) as raw:
+        assert raw == orjson.dumps(study)
+        assert isinstance(raw, bytes)
@@ -1,7 +1,24 @@
 import json
+import logging
+import mmap
+import multiprocessing
 import os
-from pymongo import MongoClient
-from jsonschema import validate, ValidationError
+import re
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import fastjsonschema
+import orjson
+import xxhash
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import BulkWriteError
+from tqdm.auto import tqdm
+from tqdm.contrib.logging import logging_redirect_tqdm
+
+logger = logging.getLogger(__name__)
 
 # Define schema (adapt as needed)
 study_schema = {
@@ -81,20 +98,16 @@ study_schema = {
                         "items": {"type": "string"}
                     },
                     "feature_selection": {
-                        "oneOf": [
-                            {"type": "null"},
-                            {
-                                "type": "object",
-                                "properties": {
-                                    "methods": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    },
-                                    "combination": {"type": "string"}
-                                },
-                                "required": ["methods"]
-                            }
-                        ]
+                        # null or an object; properties/required only apply to objects
+                        "type": ["null", "object"],
+                        "properties": {
+                            "methods": {
+                                "type": "array",
+                                "items": {"type": "string"}
+                            },
+                            "combination": {"type": "string"}
+                        },
+                        "required": ["methods"]
                     },
                     "missing_value_handling": {
                         "type": "array",
@@ -124,22 +137,288 @@ study_schema = {
                     "validation": {"type": ["string", "null"]},
                     "results": {
                         "type": "object",
-                        "patternProperties": {
-                            ".*": {  # any key is allowed
-                                "type": ["number", "string", "null"]
-                            }
-                        },
-                        "additionalProperties": False
+                        "additionalProperties": {  # any key is allowed, values are typed
+                            "type": ["number", "string", "null"]
+                        }
                     }
                 },
                 "required": ["algorithm", "results"]
             }
         }
     },
-    "required": ["study_id", "title", "authors", "publication_type", "journal", "year", "doi", "ml_approaches"],
-    "additionalProperties": True  # Allow for future extensibility
+    # Other top-level keys are allowed for future extensibility (the JSON Schema default)
+    "required": ["study_id", "title", "authors", "publication_type", "journal", "year", "doi", "ml_approaches"]
 }
 
+# Minimal schema used by check_file_health: only the fields needed for import
+health_schema = {
+    "type": "object",
+    "required": ["title", "year", "doi", "ml_approaches"]
+}
+
+# Compiled once at import: fastjsonschema generates a plain Python function for each schema
+_validate = fastjsonschema.compile(study_schema)
+_validate_health = fastjsonschema.compile(health_schema)
+
+# Number of validated studies buffered before a single insert_many round-trip
+INSERT_BATCH_SIZE = 500
+
+# Batches handed to the writer thread but not yet collected; past this the
+# main loop waits for the oldest, so a slow server does not buffer every file
+MAX_PENDING_FLUSHES = 2
+
+# Dataset fields of the schema that identify which data a study was run on
+DATASET_FIELDS = ("source_dataset", "target_dataset")
+
+# MongoDB error code for a duplicate key on insert or upsert
+DUPLICATE_KEY_ERROR = 11000
+
+# Files at least this large are memory-mapped instead of read into a bytes object
+MMAP_MIN_SIZE = 64 * 1024
+
+# orjson turns integers outside the 64-bit range into floats, which can only
+# happen with 19 or more digits; such files are parsed again with json
+_LONG_DIGIT_RUN = re.compile(rb"\d{19,}")
+
+# Set in each worker process by _init_worker: content hashes of the files
+# already imported, and the DOI/title lookup tables of the stored studies
+# with the duplicate mode (None when duplicate detection is disabled)
+_known_hashes = frozenset()
+_stored_studies = None
+
+
+def _iter_json_files(folder_path):
+    """Recursively yield the paths of the .json files under folder_path, skipping unreadable folders."""
+    try:
+        entries = os.scandir(folder_path)
+    except OSError as e:
+        logger.warning("⚠️ Skipping unreadable folder %s: %s", folder_path, e)
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_json_files(entry.path)
+            elif entry.name.endswith(".json") and entry.is_file():
+                yield entry.path
+
+
+@contextmanager
+def _open_bytes(file_path):
+    """Yield the content of a file as a bytes-like object, memory-mapping large files."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            yield view
+
+
+def _init_worker(known_hashes, stored_studies):
+    """Give a worker process what it needs to recognise already imported studies."""
+    global _known_hashes, _stored_studies
+    _known_hashes = known_hashes
+    _stored_studies = stored_studies
+
+
+def _parse_validate(file_path):
+    """
+    Hash, load and schema-validate one study file. Runs in a worker process.
+    Checks run cheapest first: content hash, then DOI/title against the
+    stored studies, then the schema.
+    Returns (file_path, status, payload, content_hash) where status is "ok"
+    (payload is (keys, dataset_names, document): the study's _id/doi/title,
+    its dataset names and the study encoded as BSON), "stored" (payload is
+    (keys, existing_id): the study's doi/title and the _id of the stored
+    study it matches; it was not validated), "known" (the file content was imported before,
+    payload is None), or "invalid", "decode_error" or "error" (payload is
+    the report entry for the failure).
+    """
+    content_hash = None
+    try:
+        with _open_bytes(file_path) as raw:
+            content_hash = xxhash.xxh3_64_hexdigest(raw)
+            # A byte-identical file was already imported: no need to parse or validate it
+            if content_hash in _known_hashes:
+                return file_path, "known", None, content_hash
+            data = orjson.loads(raw)
+            # Keep exact integers, so out-of-range values fail BSON encoding
+            # below instead of being stored as rounded floats
+            if _LONG_DIGIT_RUN.search(raw):
+                data = json.loads(bytes(raw))
+    except orjson.JSONDecodeError as e:
+        return file_path, "decode_error", {
+            "file": file_path,
+            "error_type": "JSON Decode Error",
+            "error_message": str(e),
+            "line": getattr(e, 'lineno', 'unknown'),
+            "column": getattr(e, 'colno', 'unknown')
+        }, content_hash
+    except Exception as e:
+        return file_path, "error", {
+            "file": file_path,
+            "error_type": type(e).__name__,
+            "error_message": str(e)
+        }, content_hash
+
+    # Studies that are already stored are not worth validating; the main
+    # process reports them as duplicates of the matched study
+    if (
+        _stored_studies is not None
+        and isinstance(data, dict)
+        and all(isinstance(data.get(key, ""), str) for key in ("doi", "title"))
+    ):
+        existing_by_doi, existing_by_title, match_datasets = _stored_studies
+        existing_id = _find_duplicate(
+            data, existing_by_doi, existing_by_title, _dataset_names(data) if match_datasets else None
+        )
+        if existing_id is not None:
+            keys = {key: data[key] for key in ("doi", "title") if key in data}
+            return file_path, "stored", (keys, existing_id), content_hash
+
+    # ✅ Schema validation
+    try:
+        _validate(data)
+    except fastjsonschema.JsonSchemaException as e:
+        return file_path, "invalid", {
+            "file": file_path,
+            "error": e.message,
+            "path": e.path
+        }, content_hash
+
+    # Encode to BSON here, once, so the main process only handles bytes and
+    # the few keys used for duplicate detection. The _id is assigned up front
+    # so later files in the same run can be matched against this study.
+    data.setdefault("_id", ObjectId())
+    try:
+        document = bson.encode(data)
+    except Exception as e:
+        return file_path, "error", {
+            "file": file_path,
+            "error_type": type(e).__name__,
+            "error_message": str(e)
+        }, content_hash
+
+    keys = {key: data[key] for key in ("_id", "doi", "title") if key in data}
+    return file_path, "ok", (keys, _dataset_names(data), document), content_hash
+
+
+def _dataset_names(study):
+    """Return the set of dataset names referenced by a study."""
+    names = set()
+    for field in DATASET_FIELDS:
+        datasets = study.get(field)
+        if isinstance(datasets, list):
+            names.update(d["name"] for d in datasets if isinstance(d, dict) and isinstance(d.get("name"), str))
+    return frozenset(names)
+
+
+def _index_study(existing_by_doi, existing_by_title, study, dataset_names):
+    """Register a stored (or queued) study in the DOI and title lookup tables."""
+    entry = (study["_id"], dataset_names)
+    if study.get("doi"):
+        existing_by_doi.setdefault(study["doi"], []).append(entry)
+    if "title" in study:
+        existing_by_title.setdefault(study["title"], []).append(entry)
+
+
+def _unindex_study(existing_by_doi, existing_by_title, study):
+    """Remove a queued study whose insert failed from the DOI and title lookup tables."""
+    keys = []
+    if study.get("doi"):
+        keys.append((existing_by_doi, study["doi"]))
+    if "title" in study:
+        keys.append((existing_by_title, study["title"]))
+    for table, key in keys:
+        entries = [entry for entry in table.get(key, []) if entry[0] != study["_id"]]
+        if entries:
+            table[key] = entries
+        else:
+            table.pop(key, None)
+
+
+def _find_duplicate(study, existing_by_doi, existing_by_title, dataset_names=None):
+    """
+    Look up a study by DOI, or by title when it has no DOI.
+    When dataset_names is given, the stored study must also share a dataset
+    name (or, if dataset_names is empty, reference any dataset at all).
+    Returns the _id of the matching stored study, or None.
+    """
+    if study.get("doi"):
+        candidates = existing_by_doi.get(study["doi"], [])
+    elif "title" in study:
+        candidates = existing_by_title.get(study["title"], [])
+    else:
+        return None
+
+    for existing_id, existing_names in candidates:
+        if dataset_names is None:
+            return existing_id
+        if dataset_names & existing_names if dataset_names else existing_names:
+            return existing_id
+    return None
+
+
+def _flush_inserts(collection, hash_collection, pending, pending_files, pending_hashes):
+    """
+    Insert the buffered studies (already BSON-encoded) with one unordered
+    insert_many call, then record the content hashes of the files that were
+    inserted. Runs on the writer thread.
+    Returns the number of inserted documents, the load error report entries
+    of the documents that failed and the pending_hashes entries of those
+    documents. If the insert fails as a whole (e.g. the connection is lost),
+    every file of the batch is reported.
+    """
+    if not pending:
+        return 0, [], []
+
+    failed_indexes, errors = set(), []
+    try:
+        collection.insert_many(pending, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            failed_indexes.add(error["index"])
+            file_path = pending_files[error["index"]]
+            errors.append({
+                "file": file_path,
+                "error_type": "BulkWriteError",
+                "error_message": error.get("errmsg", "unknown")
+            })
+            logger.error("❌ Insert failed for %s: %s", file_path, error.get("errmsg", "unknown"))
+    except Exception as e:
+        # Nothing is known to be inserted, so no content hash is recorded either
+        for file_path in pending_files:
+            errors.append({
+                "file": file_path,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            })
+            logger.error("❌ Insert failed for %s: %s", file_path, e)
+        return 0, errors, pending_hashes
+
+    hashed_files = [file_path for index, file_path in enumerate(pending_files) if index not in failed_indexes]
+    hash_docs = [doc for index, doc in enumerate(pending_hashes) if index not in failed_indexes]
+    if hash_docs:
+        try:
+            # Upsert, so a hash left behind by a study that was deleted since
+            # points to the study stored now
+            hash_collection.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in hash_docs], ordered=False
+            )
+        except BulkWriteError as e:
+            # Duplicate keys are hashes upserted at the same time by another import;
+            # anything else means those files will not be recognised as imported next time
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    logger.error(
+                        "❌ Could not record the content hash of %s: %s",
+                        hashed_files[error["index"]], error.get("errmsg", "unknown")
+                    )
+        except Exception as e:
+            logger.error("❌ Could not record the content hashes of %d files: %s", len(hash_docs), e)
+
+    failed = [pending_hashes[index] for index in sorted(failed_indexes)]
+    return len(pending) - len(failed_indexes), errors, failed
+
 
 def import_json_studies(
     mongo_uri="mongodb://localhost:27017/",
@@ -176,105 +455,207 @@ def import_json_studies(
     client = MongoClient(mongo_uri)
     db = client[db_name]
     collection = db[collection_name]
+    hash_collection = db[f"{collection_name}_import_hashes"]
+
+    # Indexes on the duplicate-detection keys (create_index is a no-op if they already exist)
+    collection.create_index("doi", sparse=True)
+    collection.create_index("title")
+    for field in DATASET_FIELDS:
+        collection.create_index(f"{field}.name")
 
     count_inserted, count_skipped, count_invalid, count_load_errors = 0, 0, 0, 0
     duplicate_report, validation_report, load_error_report = [], [], []
+    pending, pending_files, pending_hashes = [], [], []
+
+    # Load the keys of the studies already stored in one query, so duplicate
+    # detection is an in-memory lookup instead of a find_one per file
+    existing_by_doi, existing_by_title, known_hashes = {}, {}, {}
+    if skip_duplicate_check is not True:
+        projection = {"_id": 1, "doi": 1, "title": 1}
+        projection.update({f"{field}.name": 1 for field in DATASET_FIELDS})
+        for doc in collection.find({}, projection):
+            _index_study(existing_by_doi, existing_by_title, doc, _dataset_names(doc))
+
+        # Content hashes of previously imported files whose study is still stored
+        stored_ids = {
+            entry[0] for entries in (*existing_by_doi.values(), *existing_by_title.values()) for entry in entries
+        }
+        for doc in hash_collection.find():
+            if doc["study_id"] in stored_ids:
+                known_hashes[doc["_id"]] = doc["study_id"]
 
     # Walk through all subfolders
-    for root, _, files in os.walk(folder_path):
-        for filename in files:
-            if filename.endswith(".json"):
-                file_path = os.path.join(root, filename)
-                with open(file_path, "r", encoding="utf-8") as f:
-                    try:
-                        data = json.load(f)
-
-                        # ✅ Schema validation
-                        try:
-                            validate(instance=data, schema=study_schema)
-                        except ValidationError as e:
-                            validation_report.append({
-                                "file": file_path,
-                                "error": str(e)
-                            })
-                            print(f"❌ Schema validation failed: {file_path}")
-                            count_invalid += 1
-                            continue
-
-                        # ✅ Duplicate check (if enabled)
-                        if not skip_duplicate_check:
-                            query = {}
-                            
-                            if skip_duplicate_check == "basic":
-                                # Basic duplicate detection (original logic)
-                                if "doi" in data and data["doi"]:
-                                    query["doi"] = data["doi"]
-                                elif "title" in data:
-                                    query["title"] = data["title"]
-                                    
-                                reason_text = "doi" if "doi" in query else "title"
-                                duplicate_text = f"⚠️ Duplicate found (same {reason_text}): {file_path}"
-                                
-                            else:
-                                # Enhanced duplicate detection - include dataset information
-                                if "doi" in data and data["doi"]:
-                                    # Check for same DOI AND same dataset names
-                                    dataset_names = []
-                                    if "dataset" in data and isinstance(data["dataset"], list):
-                                        dataset_names = [d.get("name", "") for d in data["dataset"] if isinstance(d, dict)]
-                                    
-                                    query = {
-                                        "doi": data["doi"],
-                                        "dataset.name": {"$in": dataset_names} if dataset_names else {"$exists": True}
-                                    }
-                                elif "title" in data:
-                                    # Check for same title AND same dataset names
-                                    dataset_names = []
-                                    if "dataset" in data and isinstance(data["dataset"], list):
-                                        dataset_names = [d.get("name", "") for d in data["dataset"] if isinstance(d, dict)]
-                                    
-                                    query = {
-                                        "title": data["title"],
-                                        "dataset.name": {"$in": dataset_names} if dataset_names else {"$exists": True}
-                                    }
-                                
-                                reason_text = "doi+dataset" if "doi" in query else "title+dataset"
-                                duplicate_text = f"⚠️ Duplicate found (same DOI/title + dataset): {file_path}"
-
-                            if query and (existing := collection.find_one(query)):
-                                duplicate_report.append({
-                                    "file": file_path,
-                                    "reason": reason_text,
-                                    "value": data.get("doi", data.get("title", "unknown")),
-                                    "existing_id": str(existing["_id"]),
-                                })
-                                print(duplicate_text)
-                                count_skipped += 1
-                                continue
-
-                        # ✅ Insert if valid + not duplicate
-                        collection.insert_one(data)
-                        count_inserted += 1
-                        
-                    except json.JSONDecodeError as e:
-                        load_error_report.append({
-                            "file": file_path,
-                            "error_type": "JSON Decode Error",
-                            "error_message": str(e),
-                            "line": getattr(e, 'lineno', 'unknown'),
-                            "column": getattr(e, 'colno', 'unknown')
-                        })
-                        print(f"❌ JSON decode error in {file_path}: {e}")
-                        count_load_errors += 1
-                        
-                    except Exception as e:
-                        load_error_report.append({
-                            "file": file_path,
-                            "error_type": type(e).__name__,
-                            "error_message": str(e)
-                        })
-                        print(f"❌ Unexpected error in {file_path}: {e}")
-                        count_load_errors += 1
+    file_paths = list(_iter_json_files(folder_path))
+
+    # Parsing and validation run in worker processes, duplicate checks in the
+    # main process, and Mongo writes on a single writer thread so inserts
+    # overlap with the processing of the next files
+    stored_studies = None
+    if skip_duplicate_check is not True:
+        stored_studies = (existing_by_doi, existing_by_title, skip_duplicate_check != "basic")
+
+    # Workers must not be forked from this process: the MongoClient has already
+    # started its monitor threads and is not fork-safe
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+    # A queued study is only known to be stored once its batch is flushed.
+    # Until then queued maps its _id to its keys and to the files skipped as
+    # its duplicates: if the insert fails, the study is removed from the
+    # lookup tables again and those files are processed again from retries.
+    queued, flushes, retries = {}, deque(), deque()
+
+    def process_result(file_path, status, payload, content_hash):
+        """Report a worker result, or queue its study for insert."""
+        nonlocal count_skipped, count_invalid, count_load_errors
+        result = (file_path, status, payload, content_hash)
+
+        if status == "invalid":
+            validation_report.append(payload)
+            logger.warning("❌ Schema validation failed: %s", file_path)
+            count_invalid += 1
+            return
+
+        if status == "decode_error":
+            load_error_report.append(payload)
+            logger.error("❌ JSON decode error in %s: %s", file_path, payload["error_message"])
+            count_load_errors += 1
+            return
+
+        if status == "error":
+            load_error_report.append(payload)
+            logger.error("❌ Unexpected error in %s: %s", file_path, payload["error_message"])
+            count_load_errors += 1
+            return
+
+        # ✅ Exact duplicate check: same file content as an already imported file
+        if content_hash in known_hashes:
+            existing_id = known_hashes[content_hash]
+            report = {
+                "file": file_path,
+                "reason": "content",
+                "value": content_hash,
+                "existing_id": str(existing_id),
+            }
+            duplicate_report.append(report)
+            if str(existing_id) in queued:
+                queued[str(existing_id)][1].append((report, result))
+            logger.info("⚠️ Duplicate found (same file content): %s", file_path)
+            count_skipped += 1
+            return
+
+        try:
+            if status == "stored":
+                # The worker already matched this study against the stored ones
+                data, existing_id = payload
+            else:
+                data, dataset_names, document = payload
+                existing_id = None
+
+            # ✅ Duplicate check (if enabled)
+            if skip_duplicate_check is not True:
+                if skip_duplicate_check == "basic":
+                    # Basic duplicate detection (same DOI, or same title when there is no DOI)
+                    if status != "stored":
+                        existing_id = _find_duplicate(data, existing_by_doi, existing_by_title)
+                    reason_text = "doi" if data.get("doi") else "title"
+                    duplicate_text = f"⚠️ Duplicate found (same {reason_text}): %s"
+                else:
+                    # Enhanced duplicate detection - include dataset information
+                    if status != "stored":
+                        existing_id = _find_duplicate(data, existing_by_doi, existing_by_title, dataset_names)
+                    reason_text = "doi+dataset" if data.get("doi") else "title+dataset"
+                    duplicate_text = "⚠️ Duplicate found (same DOI/title + dataset): %s"
+
+                if existing_id is not None:
+                    report = {
+                        "file": file_path,
+                        "reason": reason_text,
+                        "value": data.get("doi", data.get("title", "unknown")),
+                        "existing_id": str(existing_id),
+                    }
+                    duplicate_report.append(report)
+                    if str(existing_id) in queued:
+                        queued[str(existing_id)][1].append((report, result))
+                    logger.info(duplicate_text, file_path)
+                    count_skipped += 1
+                    return
+
+            # ✅ Queue for insert if valid + not duplicate
+            _index_study(existing_by_doi, existing_by_title, data, dataset_names)
+            queued.setdefault(str(data["_id"]), (data, []))
+            if skip_duplicate_check is not True:
+                known_hashes[content_hash] = data["_id"]
+            pending.append(RawBSONDocument(document))
+            pending_files.append(file_path)
+            pending_hashes.append({"_id": content_hash, "study_id": data["_id"]})
+            if len(pending) >= INSERT_BATCH_SIZE:
+                submit_flush()
+
+        except Exception as e:
+            load_error_report.append({
+                "file": file_path,
+                "error_type": type(e).__name__,
+                "error_message": str(e)
+            })
+            logger.error("❌ Unexpected error in %s: %s", file_path, e)
+            count_load_errors += 1
+
+    def submit_flush():
+        """Hand the buffered studies to the writer thread and start a new buffer."""
+        nonlocal pending, pending_files, pending_hashes
+        flush = writer.submit(_flush_inserts, collection, hash_collection, pending, pending_files, pending_hashes)
+        flushes.append((flush, pending_hashes))
+        pending, pending_files, pending_hashes = [], [], []
+        while len(flushes) > MAX_PENDING_FLUSHES:
+            collect_flush()
+
+    def collect_flush():
+        """Wait for the oldest flush and undo the studies of its batch that were not inserted."""
+        nonlocal count_inserted, count_load_errors, count_skipped
+        flush, batch_hashes = flushes.popleft()
+        inserted, errors, failed = flush.result()
+        count_inserted += inserted
+        count_load_errors += len(errors)
+        load_error_report.extend(errors)
+
+        failed_ids = {str(hash_doc["study_id"]) for hash_doc in failed}
+        for hash_doc in batch_hashes:
+            entry = queued.pop(str(hash_doc["study_id"]), None)
+            if entry is None or str(hash_doc["study_id"]) not in failed_ids:
+                continue
+            study, skipped = entry
+            _unindex_study(existing_by_doi, existing_by_title, study)
+            known_hashes.pop(hash_doc["_id"], None)
+            # The files skipped as duplicates of this study are not duplicates after all
+            retried = {id(report) for report, _ in skipped}
+            duplicate_report[:] = [report for report in duplicate_report if id(report) not in retried]
+            count_skipped -= len(skipped)
+            retries.extend(result for _, result in skipped)
+
+    with ProcessPoolExecutor(
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+        initargs=(frozenset(known_hashes), stored_studies)
+    ) as executor, ThreadPoolExecutor(max_workers=1) as writer, logging_redirect_tqdm():
+        results = executor.map(_parse_validate, file_paths, chunksize=32)
+        for result in tqdm(results, total=len(file_paths), desc="Importing studies", unit="file"):
+            process_result(*result)
+            # Collect finished flushes right away, so a failed batch stops
+            # matching later files as soon as it is known
+            while flushes and flushes[0][0].done():
+                collect_flush()
+            while retries:
+                process_result(*retries.popleft())
+
+        # Insert whatever is left in the buffer and wait for the writer. Files
+        # skipped as duplicates of a study that failed to insert are processed
+        # again, which may queue them for another flush.
+        while pending or flushes:
+            if pending:
+                submit_flush()
+            collect_flush()
+            while retries:
+                process_result(*retries.popleft())
 
     # 📊 Final summary
     print(f"\n✅ Imported {count_inserted} studies")
@@ -284,18 +665,18 @@ def import_json_studies(
 
     # 📄 Save reports
     if duplicate_report:
-        with open("duplicate_report.json", "w", encoding="utf-8") as f:
-            json.dump(duplicate_report, f, indent=2)
+        with open("duplicate_report.json", "wb") as f:
+            f.write(orjson.dumps(duplicate_report, option=orjson.OPT_INDENT_2))
         print("📄 Duplicate report saved to duplicate_report.json")
 
     if validation_report:
-        with open("validation_report.json", "w", encoding="utf-8") as f:
-            json.dump(validation_report, f, indent=2)
+        with open("validation_report.json", "wb") as f:
+            f.write(orjson.dumps(validation_report, option=orjson.OPT_INDENT_2))
         print("📄 Validation report saved to validation_report.json")
 
     if load_error_report:
-        with open("load_error_report.json", "w", encoding="utf-8") as f:
-            json.dump(load_error_report, f, indent=2)
+        with open("load_error_report.json", "wb") as f:
+            f.write(orjson.dumps(load_error_report, option=orjson.OPT_INDENT_2))
         print("📄 Load error report saved to load_error_report.json")
         print("🔍 Check load_error_report.json for files that couldn't be loaded")
 
@@ -312,49 +693,54 @@ def check_file_health(folder_path=None):
         return
     
     print(f"🔍 Checking JSON files in: {folder_path}")
-    
+
     total_files = 0
     valid_files = 0
     problematic_files = []
     
     # Walk through all subfolders
-    for root, _, files in os.walk(folder_path):
-        for filename in files:
-            if filename.endswith(".json"):
-                file_path = os.path.join(root, filename)
-                total_files += 1
+    for file_path in _iter_json_files(folder_path):
+        total_files += 1
+        
+        try:
+            with _open_bytes(file_path) as raw:
+                data = orjson.loads(raw)
                 
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        
-                    # Basic validation - check if it has required fields
-                    missing_fields = []
-                    for required_field in ["title", "year", "doi", "ml_approaches"]:
-                        if required_field not in data:
-                            missing_fields.append(required_field)
-                    
-                    if missing_fields:
-                        problematic_files.append({
-                            "file": file_path,
-                            "issue": "Missing required fields",
-                            "details": missing_fields
-                        })
-                    else:
-                        valid_files += 1
-                        
-                except json.JSONDecodeError as e:
+            # Basic validation - check if it has required fields
+            try:
+                _validate_health(data)
+                missing_fields = []
+            except fastjsonschema.JsonSchemaException:
+                if not isinstance(data, dict):
                     problematic_files.append({
                         "file": file_path,
-                        "issue": "JSON Decode Error",
-                        "details": f"Line {getattr(e, 'lineno', '?')}, Column {getattr(e, 'colno', '?')}: {str(e)}"
-                    })
-                except Exception as e:
-                    problematic_files.append({
-                        "file": file_path,
-                        "issue": type(e).__name__,
-                        "details": str(e)
+                        "issue": "Not a JSON object",
+                        "details": f"Top-level value is {type(data).__name__}"
                     })
+                    continue
+                missing_fields = [field for field in health_schema["required"] if field not in data]
+            
+            if missing_fields:
+                problematic_files.append({
+                    "file": file_path,
+                    "issue": "Missing required fields",
+                    "details": missing_fields
+                })
+            else:
+                valid_files += 1
+                
+        except orjson.JSONDecodeError as e:
+            problematic_files.append({
+                "file": file_path,
+                "issue": "JSON Decode Error",
+                "details": f"Line {getattr(e, 'lineno', '?')}, Column {getattr(e, 'colno', '?')}: {str(e)}"
+            })
+        except Exception as e:
+            problematic_files.append({
+                "file": file_path,
+                "issue": type(e).__name__,
+                "details": str(e)
+            })
     
     # Summary
     print(f"\n📊 File Health Check Summary:")
@@ -371,8 +757,8 @@ def check_file_health(folder_path=None):
             print()
         
         # Save detailed report
-        with open("file_health_report.json", "w", encoding="utf-8") as f:
-            json.dump(problematic_files, f, indent=2)
+        with open("file_health_report.json", "wb") as f:
+            f.write(orjson.dumps(problematic_files, option=orjson.OPT_INDENT_2))
         print("📄 Detailed report saved to file_health_report.json")
     else:
         print("🎉 All files are healthy and ready for import!")
\ No newline at end of file